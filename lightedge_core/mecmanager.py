@@ -17,17 +17,70 @@
 
 """MEC Manager."""
 
+import asyncio
 import json
+import time
+
+from importlib import import_module
 
 from tornado.httpclient import AsyncHTTPClient
+from tornado.httpclient import HTTPClientError
+from tornado.httpclient import HTTPRequest
+
+try:
+    import orjson
+    # Leave to serialize whatever it would render differently
+    ORJSON_OPTION = orjson.OPT_PASSTHROUGH_DATETIME | \
+        orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_SUBCLASS
+except ImportError:
+    orjson = None
+
+# libcurl keeps connections alive, the simple client does not
+try:
+    import pycurl
+    from tornado.curl_httpclient import CurlAsyncHTTPClient
+    AsyncHTTPClient.configure(CurlAsyncHTTPClient)
+except ImportError:
+    pycurl = None
+    CurlAsyncHTTPClient = None
 
 from empower_core.launcher import srv_or_die
 from empower_core.serialize import serialize
 from empower_core.service import EService
-from lightedge_core.subscription import Subscription
 
 DEFAULT_REGISTRY = "http://127.0.0.1:8887/api/v1/services"
 
+HEADERS = {"Connection": "keep-alive"}
+JSON_HEADERS = {**HEADERS, "Content-Type": "application/json"}
+
+# Each concurrent in-flight request holds one file descriptor
+DEFAULT_MAX_CLIENTS = 64
+
+# Timeouts (in s), a stuck peer must not stall the keep-alive loop
+DEFAULT_CONNECT_TIMEOUT = 1.0
+DEFAULT_REQUEST_TIMEOUT = 5.0
+
+# Upper bound (in ms) for the registration retry period
+MAX_BACKOFF = 60000
+
+
+def dumps(obj):
+    """Return obj as a JSON document (bytes).
+
+    orjson is used when available, falling back to json for what orjson
+    refuses (e.g. non-str dict keys or integers over 64 bits). The only
+    known difference is that orjson writes NaN and Infinity as null, while
+    json writes them as NaN and Infinity, which are not valid JSON."""
+
+    if orjson:
+
+        try:
+            return orjson.dumps(obj, default=serialize, option=ORJSON_OPTION)
+        except TypeError:
+            pass
+
+    return json.dumps(serialize(obj)).encode()
+
 
 class MECManager(EService):
     """MEC Microservice baseclass."""
@@ -36,10 +89,45 @@ class MECManager(EService):
 
     def __init__(self, **kwargs):
 
+        # Declaration
+        self._state = None
+        self._mec_service = None
+        self._mec_service_body = None
+        self._to_dict = None
+
+        # Active subscriptions, see track_subscription()
+        self._subscriptions = {}
+
+        # Cached subscriptions links, dropped whenever subscriptions change
+        self._links = None
+
+        # Current retry period (in ms, 0 if registered) and next attempt
+        self._backoff = 0
+        self._next_try = 0.0
+
         super().__init__(**kwargs)
 
         self.state = "UNREGISTERED"
 
+        # Import the subscription modules once, fail early if one is missing
+        for name in self.SUBSCRIPTIONS.values():
+            import_module(name)
+
+        # Registration URL, neither registry nor service_id can change
+        self._register_url = f"{self.registry}/{self.service_id}"
+
+        # HTTP client owned by this manager, reused across keep-alives and
+        # REST calls, not shared so that max_clients is always honoured
+        self.http_client = AsyncHTTPClient(force_instance=True,
+                                           max_clients=self.max_clients)
+
+        # Keep idle connections to the registry and the controller around
+        if CurlAsyncHTTPClient and \
+                isinstance(self.http_client, CurlAsyncHTTPClient):
+            # pylint: disable=protected-access
+            self.http_client._multi.setopt(pycurl.M_MAXCONNECTS,
+                                           4 * self.max_clients)
+
     @property
     def registry(self):
         """Return registry."""
@@ -50,68 +138,196 @@ class MECManager(EService):
     def registry(self, value):
         """Set registry."""
 
-        if "registry" in self.params and self.params["registry"]:
+        if self.params.get("registry"):
             raise ValueError("Param registry can not be changed")
 
         self.params["registry"] = str(value)
 
+    @property
+    def state(self):
+        """Return state."""
+
+        return self._state
+
+    @state.setter
+    def state(self, value):
+        """Set state."""
+
+        if value == self._state:
+            return
+
+        self._state = value
+
+        # The MEC service descriptor embeds the state, build a new one so
+        # that the descriptors already handed out are left untouched
+        self._mec_service = None
+        self._mec_service_body = None
+        self._to_dict = None
+
+    @property
+    def max_clients(self):
+        """Return max_clients."""
+
+        return self.params["max_clients"]
+
+    @max_clients.setter
+    def max_clients(self, value):
+        """Set max_clients."""
+
+        if self.params.get("max_clients"):
+            raise ValueError("Param max_clients can not be changed")
+
+        if int(value) < 1:
+            raise ValueError("Param max_clients must be at least 1")
+
+        self.params["max_clients"] = int(value)
+
+    @property
+    def connect_timeout(self):
+        """Return connect_timeout."""
+
+        return self.params["connect_timeout"]
+
+    @connect_timeout.setter
+    def connect_timeout(self, value):
+        """Set connect_timeout."""
+
+        if self.params.get("connect_timeout"):
+            raise ValueError("Param connect_timeout can not be changed")
+
+        self.params["connect_timeout"] = float(value)
+
+    @property
+    def request_timeout(self):
+        """Return request_timeout."""
+
+        return self.params["request_timeout"]
+
+    @request_timeout.setter
+    def request_timeout(self, value):
+        """Set request_timeout."""
+
+        if self.params.get("request_timeout"):
+            raise ValueError("Param request_timeout can not be changed")
+
+        self.params["request_timeout"] = float(value)
+
     async def get(self, url):
         """REST get method."""
 
-        http_client = AsyncHTTPClient()
-        response = await http_client.fetch(url, raise_error=False)
+        request = HTTPRequest(url, headers=dict(HEADERS),
+                              connect_timeout=self.connect_timeout,
+                              request_timeout=self.request_timeout)
+
+        response = await self.http_client.fetch(request, raise_error=False)
 
         return response
 
-    async def post(self, url, data):
-        """Test post method."""
+    async def post(self, url, data=None, *, raw=None):
+        """REST post method.
+
+        Either data (a dict, the version field is added) or raw (an already
+        encoded JSON body) must be specified."""
+
+        if raw is None:
 
-        data["version"] = "1.0"
+            if data is None:
+                raise ValueError("Either data or raw must be specified")
 
-        http_client = AsyncHTTPClient()
+            raw = dumps({**data, "version": "1.0"})
 
-        response = await http_client.fetch(url,
-                                           method='POST',
-                                           body=json.dumps(data),
-                                           raise_error=False)
+        request = HTTPRequest(url, method='POST',
+                              headers=dict(JSON_HEADERS), body=raw,
+                              connect_timeout=self.connect_timeout,
+                              request_timeout=self.request_timeout)
+
+        response = await self.http_client.fetch(request, raise_error=False)
 
         return response
 
+    async def get_many(self, urls):
+        """REST get method, concurrent version.
+
+        Requests are issued in batches of at most max_clients so that they
+        do not queue inside the HTTP client. Responses are returned in the
+        same order as the urls."""
+
+        urls = list(urls)
+        responses = []
+
+        for i in range(0, len(urls), self.max_clients):
+            batch = urls[i:i + self.max_clients]
+            responses += await asyncio.gather(*(self.get(url)
+                                                for url in batch))
+
+        return responses
+
+    async def post_many(self, requests):
+        """REST post method, concurrent version.
+
+        Takes a list of (url, data) or (url, None, raw) tuples, see post()
+        and get_many()."""
+
+        # Pad (url, data) tuples to (url, data, raw)
+        requests = [(*request, None)[:3] for request in requests]
+        responses = []
+
+        for i in range(0, len(requests), self.max_clients):
+            batch = requests[i:i + self.max_clients]
+            responses += await asyncio.gather(*(self.post(url, data, raw=raw)
+                                                for url, data, raw in batch))
+
+        return responses
+
+    async def close(self):
+        """Release the HTTP client."""
+
+        self.http_client.close()
+
     @property
     def subscriptions(self):
         """Return subscriptions."""
 
-        subscriptions = {}
+        return self._subscriptions
 
-        for service in srv_or_die("envmanager").env.services.values():
+    def track_subscription(self, sub):
+        """Add a started subscription to the active ones."""
 
-            if not isinstance(service, Subscription):
-                continue
+        self._subscriptions[sub.service_id] = sub
+        self._links = None
 
-            subscriptions[service.service_id] = service
+    def untrack_subscription(self, sub):
+        """Remove a stopped subscription from the active ones."""
 
-        return subscriptions
+        self._subscriptions.pop(sub.service_id, None)
+        self._links = None
 
     def get_subscriptions_links(self):
         """Return subscriptions."""
 
-        href = self.mec_service['serCategory']['href']
+        if self._links is not None:
+            return self._links
+
+        href = self.mec_service['serCategory']['href'] + "/subscriptions"
+        links = []
 
         out = {
             "_links": {
-                "self": "%s/subscriptions" % href,
-                "subscription": []
+                "self": href,
+                "subscription": links
             }
         }
 
+        append = links.append
+
         for sub in self.subscriptions.values():
 
-            to_add = {
-                "href": "%s/subscriptions/%s" % (href, sub.service_id),
+            append({
+                "href": "%s/%s" % (href, sub.service_id),
                 "subscriptionType": sub.SUB_CONFIG
-            }
+            })
 
-            out["_links"]["subscription"].append(to_add)
+        self._links = out
 
         return out
 
@@ -123,7 +339,6 @@ class MECManager(EService):
 
         name = self.SUBSCRIPTIONS[params['subscriptionType']]
 
-        print(name)
         params = {
             "subscription": params
         }
@@ -146,17 +361,25 @@ class MECManager(EService):
             service_id = self.subscriptions[sub_id].service_id
             env.unregister_service(service_id=service_id)
         else:
-            for service_id in self.subscriptions:
+            # Unregistering a subscription removes it from the live dict
+            for service_id in list(self.subscriptions):
                 env.unregister_service(service_id=service_id)
 
     def to_dict(self):
-        """Return JSON representation."""
+        """Return JSON representation.
+
+        The output is rebuilt only when the state changes, params and
+        callbacks are references to the live dicts."""
+
+        if self._to_dict is None:
 
-        output = super().to_dict()
+            output = super().to_dict()
 
-        output['mec_service'] = self.mec_service
+            output['mec_service'] = self.mec_service
 
-        return output
+            self._to_dict = output
+
+        return self._to_dict
 
     @property
     def mec_service(self):
@@ -164,30 +387,50 @@ class MECManager(EService):
 
         raise ValueError("Not Implemented")
 
+    @property
+    def mec_service_body(self):
+        """Return the serialized MEC service descriptor."""
+
+        if self._mec_service_body is None:
+            self._mec_service_body = dumps(self.mec_service)
+
+        return self._mec_service_body
+
     async def loop(self):
         """Periodic job."""
 
+        # Back off while the registry is failing
+        if self._backoff and time.monotonic() < self._next_try:
+            return
+
         try:
-            await self.register()
-        except ConnectionRefusedError:
-            self.log.error("Unable to contact MEC service registry")
+            registered = await self.register()
+        except (OSError, HTTPClientError) as ex:
+            self.log.error("Unable to contact MEC service registry: %s", ex)
+            registered = False
 
-    async def register(self):
-        """Register MEC service."""
+        if registered:
+            self._backoff = 0
+            return
 
-        http_client = AsyncHTTPClient()
+        # Double the retry period at every failure, up to MAX_BACKOFF
+        self._backoff = min(2 * (self._backoff or self.every), MAX_BACKOFF)
+        self._next_try = time.monotonic() + self._backoff / 1000
 
-        url = self.registry + "/" + str(self.service_id)
-        body = serialize(self.mec_service)
+    async def register(self):
+        """Register MEC service, return True if successful."""
 
-        response = await http_client.fetch(url, method='POST',
-                                           body=json.dumps(body),
-                                           raise_error=False)
+        response = await self.post(self._register_url,
+                                   raw=self.mec_service_body)
 
         if response.code == 201:
             self.state = "REGISTERED"
-        else:
-            self.state = "UNREGISTERED"
+            self.log.info("Sending periodic keep-alive, response %u",
+                          response.code)
+            return True
+
+        self.state = "UNREGISTERED"
+        self.log.error("Unable to register MEC service, response %u",
+                       response.code)
 
-        self.log.info("Sending periodic keep-alive, response %u",
-                      response.code)
+        return False
@@ -17,9 +17,16 @@
 
 """A genercic subscription."""
 
+import asyncio
+
+from tornado.ioloop import IOLoop
+
 from empower_core.launcher import srv_or_die
+from empower_core.service import CALLBACK_REST
 from empower_core.worker import EWorker
 
+from lightedge_core.mecmanager import dumps
+
 
 class Subscription(EWorker):
     """A generci subscription."""
@@ -37,14 +44,70 @@ class Subscription(EWorker):
 
         self.manager = srv_or_die("rnimanager")
 
+        # Deliver callbacks one at a time, with at most one waiting
+        self._callbacks_lock = asyncio.Lock()
+        self._delivery_pending = False
+
+    def start(self):
+        """Start subscription."""
+
+        super().start()
+
+        self.manager.track_subscription(self)
+
+    def stop(self):
+        """Stop subscription."""
+
+        super().stop()
+
+        self.manager.untrack_subscription(self)
+
     def handle_response(self, callback):
         """Handle response to one subscription."""
 
         self.log.info("Received callback for subscription %s", self.service_id)
         self.log.info(callback)
 
+        # A waiting delivery has not read the subscription yet, it will
+        # carry this update as well
+        if self._delivery_pending:
+            return
+
         # handle callbacks
-        self.handle_callbacks()
+        self._delivery_pending = True
+        IOLoop.current().spawn_callback(self.deliver_callbacks)
+
+    async def deliver_callbacks(self, name="default"):
+        """Invoke registered callbacks.
+
+        REST callbacks are posted with the manager's HTTP client instead of
+        the blocking one used by handle_callbacks()."""
+
+        try:
+
+            async with self._callbacks_lock:
+
+                # From now on updates need a new delivery
+                self._delivery_pending = False
+
+                if name not in self.callbacks:
+                    return
+
+                if self.callbacks[name]['callback_type'] != CALLBACK_REST:
+                    self.handle_callbacks(name=name)
+                    return
+
+                callback = self.callbacks[name]['callback']
+
+                self.log.info("Handling callback %s (%s)", name,
+                              CALLBACK_REST)
+
+                response = await self.manager.post(callback, raw=dumps(self))
+
+                self.log.info("POST %s - %u", callback, response.code)
+
+        except Exception as ex:  # pylint: disable=broad-except
+            self.log.exception(ex)
 
     @property
     def uri(self):
@@ -17,6 +17,7 @@
 
 """RNIS Manager."""
 
+import copy
 import json
 
 from tornado.httpclient import AsyncHTTPClient
@@ -24,7 +25,10 @@ from tornado.httpclient import AsyncHTTPClient
 from empower_core.appworker import EVERY
 from empower_core.launcher import srv_or_die
 
+from lightedge_core.mecmanager import DEFAULT_CONNECT_TIMEOUT
+from lightedge_core.mecmanager import DEFAULT_MAX_CLIENTS
 from lightedge_core.mecmanager import DEFAULT_REGISTRY
+from lightedge_core.mecmanager import DEFAULT_REQUEST_TIMEOUT
 from lightedge_core.mecmanager import MECManager
 from lightedge_core.subscription import Subscription
 from lightedge_core.subscriptionshandler import SubscriptionsHandler
@@ -36,6 +40,20 @@ DEFAULT_PORT = 8888
 DEFAULT_USER = "root"
 DEFAULT_PWD = "root"
 
+# MEC service descriptor, serInstanceId and state are set per instance
+MEC_SERVICE = {
+    "serName": "Radio Network Information Service",
+    "serCategory": {
+        "href": "/rni/v2/",
+        "id": "rni",
+        "name": "Radio Network Information Service",
+        "version": "2.0"
+    },
+    "version": "1.0",
+    "state": "UNREGISTERED",
+    "serializer": "JSON",
+}
+
 
 class RNISManager(MECManager):
     """Service exposing the RNI service."""
@@ -48,39 +66,42 @@ class RNISManager(MECManager):
     }
 
     def __init__(self, context, service_id, ctrl_host, ctrl_port,
-                 ctrl_user, ctrl_pwd, registry, every=EVERY):
+                 ctrl_user, ctrl_pwd, registry, every=EVERY,
+                 max_clients=DEFAULT_MAX_CLIENTS,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 request_timeout=DEFAULT_REQUEST_TIMEOUT):
 
         super().__init__(context=context, service_id=service_id,
                          ctrl_host=ctrl_host, ctrl_port=ctrl_port,
                          ctrl_user=ctrl_user, ctrl_pwd=ctrl_pwd,
-                         registry=registry, every=every)
+                         registry=registry, every=every,
+                         max_clients=max_clients,
+                         connect_timeout=connect_timeout,
+                         request_timeout=request_timeout)
+
+        # Controller credentials and address can not change
+        self._empower_url = f"http://{self.ctrl_user}:{self.ctrl_pwd}@" \
+            f"{self.ctrl_host}:{self.ctrl_port}/api/v1"
 
     @property
     def mec_service(self):
         """Return MEC service descriptor."""
 
-        return {
-            "serInstanceId": self.service_id,
-            "serName": "Radio Network Information Service",
-            "serCategory": {
-                "href": "/rni/v2/",
-                "id": "rni",
-                "name": "Radio Network Information Service",
-                "version": "2.0"
-            },
-            "version": "1.0",
-            "state": self.state,
-            "serializer": "JSON",
-        }
+        # Rebuilt only when the state changes, see MECManager.state
+        if self._mec_service is None:
+            self._mec_service = {
+                "serInstanceId": self.service_id,
+                **copy.deepcopy(MEC_SERVICE),
+                "state": self.state
+            }
+
+        return self._mec_service
 
     @property
     def empower_url(self):
         """Return empower URL."""
 
-        params = (self.ctrl_user, self.ctrl_pwd, self.ctrl_host,
-                  self.ctrl_port)
-
-        return "http://%s:%s@%s:%u/api/v1" % params
+        return self._empower_url
 
     @property
     def ctrl_host(self):
@@ -92,7 +113,7 @@ class RNISManager(MECManager):
     def ctrl_host(self, value):
         """Set ctrl_host."""
 
-        if "ctrl_host" in self.params and self.params["ctrl_host"]:
+        if self.params.get("ctrl_host"):
             raise ValueError("Param ctrl_host can not be changed")
 
         self.params["ctrl_host"] = str(value)
@@ -107,7 +128,7 @@ class RNISManager(MECManager):
     def ctrl_port(self, value):
         """Set ctrl_port."""
 
-        if "ctrl_port" in self.params and self.params["ctrl_port"]:
+        if self.params.get("ctrl_port"):
             raise ValueError("Param ctrl_port can not be changed")
 
         self.params["ctrl_port"] = int(value)
@@ -122,7 +143,7 @@ class RNISManager(MECManager):
     def ctrl_user(self, value):
         """Set ctrl_user."""
 
-        if "ctrl_user" in self.params and self.params["ctrl_user"]:
+        if self.params.get("ctrl_user"):
             raise ValueError("Param ctrl_user can not be changed")
 
         self.params["ctrl_user"] = value
@@ -137,7 +158,7 @@ class RNISManager(MECManager):
     def ctrl_pwd(self, value):
         """Set ctrl_pwd."""
 
-        if "ctrl_pwd" in self.params and self.params["ctrl_pwd"]:
+        if self.params.get("ctrl_pwd"):
             raise ValueError("Param ctrl_pwd can not be changed")
 
         self.params["ctrl_pwd"] = value
@@ -145,8 +166,12 @@ class RNISManager(MECManager):
 
 def launch(context, service_id, ctrl_host=DEFAULT_HOST,
            ctrl_port=DEFAULT_PORT, ctrl_user=DEFAULT_USER,
-           ctrl_pwd=DEFAULT_PWD, registry=DEFAULT_REGISTRY, every=EVERY):
+           ctrl_pwd=DEFAULT_PWD, registry=DEFAULT_REGISTRY, every=EVERY,
+           max_clients=DEFAULT_MAX_CLIENTS,
+           connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+           request_timeout=DEFAULT_REQUEST_TIMEOUT):
     """ Initialize the module. """
 
     return RNISManager(context, service_id, ctrl_host, ctrl_port, ctrl_user,
-                       ctrl_pwd, registry, every)
+                       ctrl_pwd, registry, every, max_clients,
+                       connect_timeout, request_timeout)
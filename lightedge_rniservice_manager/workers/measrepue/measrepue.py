@@ -20,6 +20,8 @@
 import uuid
 import json
 
+from tornado.httpclient import HTTPClientError
+
 from empower_core.app import EVERY
 from empower_core.plmnid import PLMNID
 from empower_core.imsi import IMSI
@@ -50,8 +52,8 @@ class MeasRepUe(Subscription):
 
         try:
             await self.register()
-        except ConnectionRefusedError:
-            self.log.error("Unable to contact controller")
+        except (OSError, HTTPClientError) as ex:
+            self.log.error("Unable to contact controller: %s", ex)
 
     async def register(self):
         """Worker on controller."""
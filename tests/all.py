@@ -20,6 +20,8 @@
 import unittest
 
 from .measrepue import TestMeasRepUe
+from .mecmanager import TestMECManager
+from .subscription import TestSubscription
 
 
 def full_suite():
@@ -28,6 +30,16 @@ def full_suite():
     suite = unittest.TestSuite()
 
     suite.addTest(TestMeasRepUe('test_create_meas_rep_ue'))
+    suite.addTest(TestMECManager('test_backoff'))
+    suite.addTest(TestMECManager('test_close'))
+    suite.addTest(TestMECManager('test_dumps'))
+    suite.addTest(TestMECManager('test_get_many'))
+    suite.addTest(TestMECManager('test_max_clients'))
+    suite.addTest(TestMECManager('test_mec_service'))
+    suite.addTest(TestMECManager('test_post_many'))
+    suite.addTest(TestMECManager('test_post_without_body'))
+    suite.addTest(TestMECManager('test_subscriptions_links'))
+    suite.addTest(TestSubscription('test_callbacks'))
 
     return suite
 
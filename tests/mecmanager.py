@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2019 Roberto Riggio
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""MEC Manager unit tests."""
+
+import asyncio
+import datetime
+import json
+import uuid
+import unittest
+
+from unittest import mock
+
+from tornado.testing import AsyncTestCase
+from tornado.testing import gen_test
+
+from empower_core.etheraddress import EtherAddress
+from empower_core.launcher import SERVICES
+
+from lightedge_core.mecmanager import MAX_BACKOFF
+from lightedge_core.mecmanager import dumps
+from lightedge_core.mecmanager import orjson
+from lightedge_rniservice_manager.managers.rnismanager.rnismanager \
+    import MEC_SERVICE
+from lightedge_rniservice_manager.managers.rnismanager.rnismanager \
+    import launch
+from lightedge_rniservice_manager.workers.measrepue.measrepue \
+    import MeasRepUe
+
+SUBSCRIPTION = {
+    "callbackReference": "http://127.0.0.1:5000/callback",
+    "filterCriteriaAssocTri": {},
+    "expiryDeadline": {
+        "seconds": 1577836800,
+        "nanoSeconds": 0
+    },
+    "subscriptionType": "MeasRepUeSubscription"
+}
+
+
+def new_manager(**kwargs):
+    """Return a new RNIS manager (no controller or registry needed)."""
+
+    return launch(context=None, service_id=uuid.uuid4(), **kwargs)
+
+
+def new_subscription():
+    """Return a new subscription without periodic loop."""
+
+    return MeasRepUe(context=None, service_id=uuid.uuid4(), every=-1,
+                     subscription=SUBSCRIPTION, uri="http://127.0.0.1")
+
+
+class TestMECManager(AsyncTestCase):
+    """MECManager unit tests."""
+
+    @gen_test
+    async def test_backoff(self):
+        """test_backoff."""
+
+        manager = new_manager(every=20000)
+
+        results = []
+
+        async def register():
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        async def tick(now, result):
+            """Run the loop at now, return True if register was called."""
+
+            results[:] = [result]
+            clock.return_value = now
+            await manager.loop()
+            return not results
+
+        monotonic = "lightedge_core.mecmanager.time.monotonic"
+
+        with mock.patch.object(manager, "register", register), \
+                mock.patch(monotonic) as clock:
+
+            # first failure, retry after 2 * every
+            self.assertTrue(await tick(0.0, False))
+            self.assertFalse(await tick(39.0, False))
+
+            # second failure, the period is capped to MAX_BACKOFF
+            self.assertTrue(await tick(40.0, False))
+            self.assertFalse(await tick(40.0 + MAX_BACKOFF / 1000 - 1, True))
+            self.assertTrue(await tick(40.0 + MAX_BACKOFF / 1000, False))
+
+            # a success resets the period
+            self.assertTrue(await tick(200.0, True))
+            self.assertTrue(await tick(200.1, True))
+
+            # unreachable registry (e.g. DNS failure), back off as well
+            self.assertTrue(await tick(300.0, OSError("unreachable")))
+            self.assertFalse(await tick(339.0, True))
+            self.assertTrue(await tick(340.0, True))
+
+    def test_dumps(self):
+        """test_dumps."""
+
+        objs = [
+            {"a": [1, 2.5, None, True], "b": (1, "x")},
+            {"id": uuid.uuid4(), "ts": datetime.datetime(2020, 1, 1)},
+            {EtherAddress("00:11:22:33:44:55"): 1, 2: "int key"},
+            {"sta": EtherAddress("00:11:22:33:44:55"), "big": 2 ** 70},
+        ]
+
+        for obj in objs:
+
+            fast = dumps(obj)
+
+            with mock.patch("lightedge_core.mecmanager.orjson", None):
+                slow = dumps(obj)
+
+            self.assertIsInstance(fast, bytes)
+            self.assertEqual(json.loads(fast), json.loads(slow))
+
+        # orjson writes NaN and Infinity as null, json does not
+        if orjson:
+            self.assertEqual(dumps({"nan": float("nan")}), b'{"nan":null}')
+
+    @gen_test
+    async def test_get_many(self):
+        """Test that get_many() keeps the order and max_clients."""
+
+        manager = new_manager(max_clients=2)
+        urls = ["http://127.0.0.1/%u" % i for i in range(5)]
+        in_flight = []
+        peak = []
+
+        async def get(url):
+            in_flight.append(url)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01 * (5 - int(url[-1])))
+            in_flight.remove(url)
+            return url
+
+        with mock.patch.object(manager, "get", get):
+            self.assertEqual(await manager.get_many(urls), urls)
+
+        self.assertEqual(max(peak), 2)
+
+    @gen_test
+    async def test_post_many(self):
+        """Test that post_many() keeps the order and max_clients."""
+
+        manager = new_manager(max_clients=2)
+        requests = [("http://127.0.0.1/%u" % i, {"i": i}) for i in range(4)]
+        requests.append(("http://127.0.0.1/4", None, b'{"i": 4}'))
+        in_flight = []
+        peak = []
+
+        async def post(url, data=None, *, raw=None):
+            in_flight.append(url)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01 * (5 - int(url[-1])))
+            in_flight.remove(url)
+            return (url, data, raw)
+
+        with mock.patch.object(manager, "post", post):
+            responses = await manager.post_many(requests)
+
+        self.assertEqual(responses[:4],
+                         [(url, data, None) for url, data in requests[:4]])
+        self.assertEqual(responses[4], requests[4])
+        self.assertEqual(max(peak), 2)
+
+    def test_max_clients(self):
+        """test_max_clients."""
+
+        first = new_manager(max_clients=8)
+        second = new_manager(max_clients=2)
+
+        # each manager owns a client sized after its own max_clients
+        self.assertIsNot(first.http_client, second.http_client)
+
+        for manager in (first, second):
+            client = manager.http_client
+            size = len(client._curls) if hasattr(client, "_curls") \
+                else client.max_clients
+            self.assertEqual(size, manager.max_clients)
+
+        for value in (0, -1):
+            with self.assertRaises(ValueError):
+                new_manager(max_clients=value)
+
+    def test_mec_service(self):
+        """test_mec_service."""
+
+        manager = new_manager()
+
+        before = manager.to_dict()
+        self.assertIs(manager.to_dict(), before)
+
+        manager.state = "REGISTERED"
+        after = manager.to_dict()
+
+        # snapshots already handed out are not modified
+        self.assertEqual(before['mec_service']['state'], "UNREGISTERED")
+        self.assertEqual(after['mec_service']['state'], "REGISTERED")
+
+        # the template is not shared
+        after['mec_service']['serCategory']['href'] = "/changed/"
+        self.assertEqual(MEC_SERVICE['serCategory']['href'], "/rni/v2/")
+        self.assertEqual(list(after['mec_service']),
+                         ["serInstanceId"] + list(MEC_SERVICE))
+
+    @gen_test
+    async def test_close(self):
+        """Test that close() releases the HTTP client."""
+
+        manager = new_manager()
+
+        await manager.close()
+
+        with self.assertRaises(RuntimeError):
+            await manager.get("http://127.0.0.1:1/")
+
+    @gen_test
+    async def test_post_without_body(self):
+        """test_post_without_body."""
+
+        manager = new_manager()
+
+        with self.assertRaises(ValueError):
+            await manager.post("http://127.0.0.1")
+
+    def test_subscriptions_links(self):
+        """test_subscriptions_links."""
+
+        manager = new_manager()
+
+        SERVICES["rnimanager"] = manager
+        self.addCleanup(SERVICES.pop, "rnimanager")
+
+        links = manager.get_subscriptions_links()
+
+        # served from cache as long as subscriptions do not change
+        self.assertIs(manager.get_subscriptions_links(), links)
+
+        # starting and stopping a subscription drops the cache
+        sub = new_subscription()
+        sub.start()
+
+        self.assertIn(sub.service_id, manager.subscriptions)
+
+        links = manager.get_subscriptions_links()["_links"]
+        self.assertEqual(len(links["subscription"]), 1)
+        self.assertTrue(links["subscription"][0]["href"].endswith(
+            str(sub.service_id)))
+
+        sub.stop()
+
+        self.assertNotIn(sub.service_id, manager.subscriptions)
+
+        links = manager.get_subscriptions_links()["_links"]
+        self.assertEqual(links["subscription"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
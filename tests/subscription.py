@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2019 Roberto Riggio
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""Subscription unit tests."""
+
+import asyncio
+import json
+import unittest
+
+from unittest import mock
+
+from tornado.testing import AsyncTestCase
+from tornado.testing import gen_test
+
+from empower_core.launcher import SERVICES
+
+from .mecmanager import new_manager
+from .mecmanager import new_subscription
+
+
+class TestSubscription(AsyncTestCase):
+    """Subscription unit tests."""
+
+    @gen_test
+    async def test_callbacks(self):
+        """test_callbacks."""
+
+        manager = new_manager()
+
+        SERVICES["rnimanager"] = manager
+        self.addCleanup(SERVICES.pop, "rnimanager")
+
+        sub = new_subscription()
+        sub.callbacks["default"] = {
+            "name": "default",
+            "callback": "http://127.0.0.1:5000/callback",
+            "callback_type": "rest"
+        }
+
+        delivered = []
+        active = []
+
+        async def post(url, data=None, *, raw=None):
+            active.append(url)
+            delivered.append((url, len(active), raw))
+            await asyncio.sleep(0.01)
+            active.pop()
+            return mock.Mock(code=200)
+
+        with mock.patch.object(manager, "post", post):
+
+            # updates received before the delivery starts are merged in it
+            for _ in range(10):
+                sub.handle_response({})
+
+            await asyncio.sleep(0.005)
+            self.assertEqual(len(delivered), 1)
+
+            # updates received while posting are not lost, they wait for
+            # the running delivery as one
+            for _ in range(10):
+                sub.handle_response({})
+
+            while len(delivered) < 2:
+                await asyncio.sleep(0.01)
+
+            await asyncio.sleep(0.05)
+
+            # a later update is delivered again
+            sub.handle_response({})
+
+            while len(delivered) < 3:
+                await asyncio.sleep(0.01)
+
+            await asyncio.sleep(0.05)
+
+        # callbacks are coalesced and posted one at a time
+        self.assertEqual(len(delivered), 3)
+
+        for url, concurrent, raw in delivered:
+            self.assertEqual(url, "http://127.0.0.1:5000/callback")
+            self.assertEqual(concurrent, 1)
+            self.assertEqual(json.loads(raw)['service_id'],
+                             str(sub.service_id))
+
+
+if __name__ == '__main__':
+    unittest.main()